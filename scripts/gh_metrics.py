@@ -1,3 +1,4 @@
+import sys
 from datetime import datetime
 from pathlib import Path
 
@@ -10,6 +11,7 @@ from config import settings
 from utils import file_io
 from utils import metrics_calculators
 from utils.GQL_Queries.github_wrappers import OrgWrapper
+from utils.GQL_Queries.github_wrappers import ReviewerTeamsNotConfigured
 
 
 # keys that will be read from settings files (dynaconf parsing) for command input defaults
@@ -83,12 +85,19 @@ table_format_option = click.option(
 @pr_count_option
 @table_format_option
 def repo_pr_metrics(org, repo, output_file_prefix, pr_count, table_format):
+    skipped_repos = []
     for repo_name in repo:
         click.echo(f"Collecting metrics for {org}/{repo_name} ...")
 
-        pr_metrics, stat_metrics = metrics_calculators.single_pr_metrics(
-            organization=org, repository=repo_name, pr_count=pr_count
-        )
+        try:
+            pr_metrics, stat_metrics = metrics_calculators.single_pr_metrics(
+                organization=org, repository=repo_name, pr_count=pr_count
+            )
+        except ReviewerTeamsNotConfigured as err:
+            # keep going with the remaining repos, exit with failure at the end
+            click.echo(f"ERROR: {err}, skipping")
+            skipped_repos.append(repo_name)
+            continue
 
         header = f"Review Metrics By PR for [{repo_name}]"
         click.echo(f"\n{'-' * len(header)}")
@@ -134,6 +143,9 @@ def repo_pr_metrics(org, repo, output_file_prefix, pr_count, table_format):
             tabulate(stat_metrics, headers="keys", tablefmt="html", floatfmt=".1f"),
         )
 
+    if skipped_repos:
+        sys.exit(1)
+
 
 @report.command(
     "reviewer-report", help="Gather metrics on reviewer actions within a GH repo"
@@ -148,12 +160,19 @@ def reviewer_actions(org, repo, output_file_prefix, pr_count, table_format):
     Will collect tier reviewer teams from the github org
     Tier reviewer teams will read from settings file, and default to what SatelliteQE uses
     """
+    skipped_repos = []
     for repo_name in repo:
         click.echo(f"Collecting metrics for {org}/{repo_name} ...")
 
-        t1_metrics, t2_metrics = metrics_calculators.reviewer_actions(
-            organization=org, repository=repo_name, pr_count=pr_count
-        )
+        try:
+            t1_metrics, t2_metrics = metrics_calculators.reviewer_actions(
+                organization=org, repository=repo_name, pr_count=pr_count
+            )
+        except ReviewerTeamsNotConfigured as err:
+            # keep going with the remaining repos, exit with failure at the end
+            click.echo(f"ERROR: {err}, skipping")
+            skipped_repos.append(repo_name)
+            continue
         header = f"Tier1 Reviewer actions by week for [{repo_name}]"
         click.echo(f"\n{'-' * len(header)}")
         click.echo(header)
@@ -192,6 +211,9 @@ def reviewer_actions(org, repo, output_file_prefix, pr_count, table_format):
             tabulate(t2_metrics, headers="keys", tablefmt="html"),
         )
 
+    if skipped_repos:
+        sys.exit(1)
+
 
 @report.command("contributor-report")
 @org_name_option
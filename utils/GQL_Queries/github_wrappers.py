@@ -1,15 +1,28 @@
-from collections import defaultdict
+import asyncio
+import heapq
+from base64 import b64decode
+from base64 import b64encode
+from collections import deque
 from datetime import datetime
 from datetime import timedelta
+from datetime import timezone
+from functools import lru_cache
+from itertools import islice
 
 import attr
 import click
-from box import Box
+import orjson
 from cached_property import cached_property
 from gql import Client as GqlClient
 from gql import gql
+from gql import GraphQLRequest
+from gql.transport.aiohttp import AIOHTTPTransport
+from gql.transport.exceptions import TransportServerError
 from gql.transport.requests import RequestsHTTPTransport
 from logzero import logger
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from config import settings
 from utils.GQL_Queries import contributors_query
@@ -20,101 +33,304 @@ from utils.GQL_Queries import review_teams_query
 GH_TOKEN = settings.gh_token
 GH_GQL_URL = "https://api.github.com/graphql"
 GH_TS_FMT = "%Y-%m-%dT%H:%M:%SZ"
+GH_HEADERS = {"Authorization": f"bearer {GH_TOKEN}"}
+# concurrent query limit, stays under GitHub's secondary rate limits
+GH_MAX_CONCURRENCY = 10
+# GH gql limits connections to 100 nodes per query
+GH_MAX_BLOCK = 100
+# connection pool and retry settings, retries apply to both transports
+GH_POOL_SIZE = 20
+GH_RETRY_TOTAL = 5
+GH_RETRY_BACKOFF = 0.5
+GH_RETRY_STATUSES = (429, 502, 503, 504)
+GH_RETRY = Retry(
+    total=GH_RETRY_TOTAL,
+    backoff_factor=GH_RETRY_BACKOFF,
+    status_forcelist=GH_RETRY_STATUSES,
+    allowed_methods=None,  # gql queries are POSTs
+)
 
 SECONDS_TO_HOURS = 3600
 
 WEEK_DELTA = timedelta(weeks=1)
-NOW = datetime.now()
+
+# parse the query documents once at import, instead of on every execute
+# never execute these directly, wrap them in a per-call GraphQLRequest with its variables
+_PR_QUERY = gql(pr_query.pr_review_query)
+_ORG_TEAMS_QUERY = gql(review_teams_query.org_teams_query)
+_CONTRIB_USER_QUERY = gql(contributors_query.contributions_counts_by_user_query)
+_CONTRIB_TEAM_QUERY = gql(contributors_query.contributions_counts_by_org_members_query)
+
+
+class ReviewerTeamsNotConfigured(Exception):
+    """The repo's tier1/tier2 teams are missing from settings, or don't exist on the org"""
+
+    pass
+
+
+@lru_cache(maxsize=65536)
+def _parse_gh_ts(timestamp):
+    """Parse a GH timestamp, always UTC in GH_TS_FMT
+
+    fromisoformat is much faster than strptime, and only needs the trailing 'Z' dropped
+    Cached since many events on a PR share timestamps
+    """
+    return datetime.fromisoformat(timestamp[:-1])
+
+
+async def _execute_with_retry(gql_session, request):
+    """Execute a GraphQLRequest on an async gql session, retrying like GH_RETRY does for requests
+
+    Retries GH_RETRY_STATUSES responses with exponential backoff,
+    the aiohttp transport has no retry handling of its own
+    """
+    for attempt in range(GH_RETRY_TOTAL + 1):
+        try:
+            return await gql_session.execute(request)
+        except TransportServerError as err:
+            if err.code not in GH_RETRY_STATUSES or attempt == GH_RETRY_TOTAL:
+                raise
+            await asyncio.sleep(GH_RETRY_BACKOFF * 2 ** attempt)
+
+
+def _cursor_offset(cursor):
+    """Decode an offset style GH cursor, which is base64 of 'cursor:<n>'
+
+    Returns:
+        int offset of the cursor, or None when the cursor is in any other format
+    """
+    try:
+        prefix, offset = b64decode(cursor, validate=True).decode().split(":")
+        return int(offset) if prefix == "cursor" else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _offset_cursor(offset):
+    """Encode an offset style GH cursor, the inverse of _cursor_offset"""
+    return b64encode(f"cursor:{offset}".encode()).decode()
+
+
+class PooledRequestsHTTPTransport(RequestsHTTPTransport):
+    """Requests transport that keeps one pooled session alive across `with` blocks
+
+    The base transport builds a new requests.Session on connect and closes it on close,
+    paying for a new TCP connection and TLS handshake every time a gql session is opened
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pooled_session = Session()
+        adapter = HTTPAdapter(
+            pool_connections=GH_POOL_SIZE,
+            pool_maxsize=GH_POOL_SIZE,
+            max_retries=GH_RETRY,
+        )
+        for prefix in "http://", "https://":
+            self.pooled_session.mount(prefix, adapter)
+
+    def connect(self):
+        if self.session is None:
+            self.session = self.pooled_session
+        else:
+            super().connect()  # raises TransportAlreadyConnected
+
+    def close(self):
+        # leave the pooled session open, keeping its connections for the next block
+        self.session = None
 
 
 @attr.s
 class GQLClient:
-    transport = RequestsHTTPTransport(
-        url=GH_GQL_URL, headers={"Authorization": f"bearer {GH_TOKEN}"}
+    """Wrap the gql clients, shared by all wrappers through _GQL_CLIENT"""
+
+    # orjson decodes the large PR block responses much faster than stdlib json
+    transport = PooledRequestsHTTPTransport(
+        url=GH_GQL_URL, headers=GH_HEADERS, json_deserialize=orjson.loads
     )
 
+    # no schema introspection, GitHub's schema is large enough to cost seconds per session
     @cached_property
     def session(self):
-        client = GqlClient(transport=self.transport, fetch_schema_from_transport=True)
+        client = GqlClient(transport=self.transport, fetch_schema_from_transport=False)
         return client
 
+    @property
+    def async_session(self):
+        """New client on its own aiohttp transport, use with `async with` for concurrent queries
 
-@attr.s
+        Built per call, an aiohttp transport holds one ClientSession bound to one event loop
+        """
+        transport = AIOHTTPTransport(
+            url=GH_GQL_URL, headers=GH_HEADERS, json_deserialize=orjson.loads
+        )
+        client = GqlClient(transport=transport, fetch_schema_from_transport=False)
+        return client
+
+
+_GQL_CLIENT = GQLClient()
+
+
+@attr.s(frozen=True)
+class ReviewerTeams:
+    """Frozensets of tier1/tier2 reviewer team members, all_tiers is their union"""
+
+    tier1 = attr.ib()
+    tier2 = attr.ib()
+    all_tiers = attr.ib()
+
+
+def _settings_team_names(organization, repo_name):
+    """Resolve the reviewer team names for a repo from settings
+
+    Only called through the _load_reviewer_teams cache, so it runs once per repo
+
+    Returns:
+        tuple of the tier1 and tier2 team names
+    """
+    org_team_names = settings.get("reviewer_teams", {}).get(organization) or {}
+    repo_team_names = org_team_names.get(repo_name) or {}
+    team_names = (repo_team_names.get("tier1"), repo_team_names.get("tier2"))
+    if None in team_names:
+        raise ReviewerTeamsNotConfigured(
+            f"Reviewer teams for [{organization}/{repo_name}] "
+            "have not been entered in settings.yaml"
+        )
+    return team_names
+
+
+@lru_cache(maxsize=64)
+def _load_reviewer_teams(organization, repo_name):
+    """Look up the tier1/tier2 reviewer team members for a repo
+
+    Cached for the life of the process, RepoWrapper instances for the same repo share one query
+    Returns:
+        ReviewerTeams, immutable since the cached instance is shared by every caller
+    """
+    tier1_name, tier2_name = _settings_team_names(organization, repo_name)
+    with _GQL_CLIENT.session as gql_session:
+        org_teams = gql_session.execute(
+            GraphQLRequest(
+                _ORG_TEAMS_QUERY, variable_values={"organization": organization}
+            )
+        )["organization"]["teams"]["nodes"]
+    teams_by_name = {t["name"]: t for t in org_teams}
+    try:
+        tier_1_team = teams_by_name[tier1_name]
+        tier_2_team = teams_by_name[tier2_name]
+    except KeyError as err:
+        logger.error(
+            "Reviewer teams in settings.yaml did not match teams on the organization."
+            f"[{organization}] teams from GitHub: "
+            f'{[t.get("name") for t in org_teams]}'
+        )
+        raise ReviewerTeamsNotConfigured(
+            f"No matching reviewer teams for [{organization}/{repo_name}]"
+        ) from err
+    tier1 = frozenset(m["login"] for m in tier_1_team["members"]["nodes"])
+    tier2 = frozenset(m["login"] for m in tier_2_team["members"]["nodes"])
+    return ReviewerTeams(tier1=tier1, tier2=tier2, all_tiers=tier1 | tier2)
+
+
+@attr.s(hash=True)
 class RepoWrapper:
-    """Class to wrap PRs within a repo, fetching PR data via GQL"""
+    """Class to wrap PRs within a repo, fetching PR data via GQL
+
+    Hashable on organization and repo_name, so pull_requests can be memoized across instances
+    """
 
     organization = attr.ib()
     repo_name = attr.ib()
 
-    gql_client = GQLClient()
+    gql_client = _GQL_CLIENT
 
     @cached_property
     def reviewer_teams(self):
         """Look up teams on the org, compare to settings file for tier1/tier2 teams
 
         Returns:
-            dictionary, keyed on 'tier1' and 'tier2', with lists of team members
+            dictionary, keyed on 'tier1' and 'tier2', with frozensets of team members
+            'all' holds the union of both tiers
         """
-        with self.gql_client.session as gql_session:
-            org_teams = gql_session.execute(
-                gql(review_teams_query.org_teams_query),
-                variable_values={"organization": self.organization},
-            )["organization"]["teams"]["nodes"]
-        try:
-            settings_team_names = settings.reviewer_teams.get(self.organization).get(
-                self.repo_name
-            )
-            tier_1_team = [
-                t for t in org_teams if t["name"] == settings_team_names.tier1
-            ][0]
-            tier_2_team = [
-                t for t in org_teams if t["name"] == settings_team_names.tier2
-            ][0]
-            return {
-                "tier1": [m["login"] for m in tier_1_team["members"]["nodes"]],
-                "tier2": [m["login"] for m in tier_2_team["members"]["nodes"]],
-            }
-        except Exception:
-            logger.error(
-                "Reviewer teams have not been entered in settings.yaml, "
-                "or did not match teams on the organization."
-                f"[{self.organization}] teams from GitHub: "
-                f'{[t.get("name") for t in org_teams]}'
-            )
-            import sys
-
-            sys.exit(1)
-
-    def pull_requests(self, count=100, block_count=50):
-        """dictionary of PRWrapper instances, keyed on PR numbers
+        teams = _load_reviewer_teams(self.organization, self.repo_name)
+        return {"tier1": teams.tier1, "tier2": teams.tier2, "all": teams.all_tiers}
+
+    async def aiter_pull_requests(
+        self, count=100, block_count=50, max_concurrency=GH_MAX_CONCURRENCY
+    ):
+        """Async generator of PRWrapper instances, newest PR first
+
+        The first block is fetched alone, its end cursor gives the cursors for the rest.
+        Offset cursors are built directly and the remaining blocks fetched concurrently,
+        any other cursor format falls back to paging through the blocks in sequence.
+        PRs are yielded from each block while the later blocks are still in flight.
+        A new block is only scheduled as one is consumed, so memory doesn't grow with count.
         Args:
             count (Int): total number of PRs fetched
             block_count(Int): number of PRs to fetch in each query, GH gql limits to 100
+            max_concurrency(Int): number of blocks in flight or waiting to be consumed at once
         """
         # gql query grabs blocks of 50 PRs at a time
         if block_count > count:
             block_count = count
-        pr_nodes = []
-        fetched = 0  # tracks total number of PRs pulled
-        gql_pr_cursor = None
-        with self.gql_client.session as gql_session:
-            while fetched < count:
-                pr_block = gql_session.execute(
-                    gql(pr_query.pr_review_query),
-                    variable_values={
-                        "prCursor": gql_pr_cursor,
-                        "blockCount": block_count,
-                    },
+        async with self.gql_client.async_session as gql_session:
+
+            async def fetch_block(cursor):
+                return await _execute_with_retry(
+                    gql_session,
+                    GraphQLRequest(
+                        _PR_QUERY,
+                        variable_values={"prCursor": cursor, "blockCount": block_count},
+                    ),
                 )
-                gql_pr_cursor = pr_block["repository"]["pullRequests"]["pageInfo"][
-                    "endCursor"
+
+            first_block = await fetch_block(None)
+            first_page = first_block["repository"]["pullRequests"]
+            end_cursor = first_page["pageInfo"]["endCursor"]
+            remaining = min(count, first_page["totalCount"]) - block_count
+            cursors = []
+            end_offset = _cursor_offset(end_cursor) if end_cursor is not None else None
+            if remaining > 0 and end_offset is not None:
+                cursors = [
+                    _offset_cursor(offset)
+                    for offset in range(end_offset, end_offset + remaining, block_count)
                 ]
-                pr_nodes.extend(pr_block["repository"]["pullRequests"]["nodes"])
-                fetched += block_count
-        prws = {}
-        # flatten data_blocks a bit, we just want the nodes
-        for pr_node in pr_nodes:
-            pr_num = pr_node["url"].split("/")[-1]
+                remaining = 0
+            pending_cursors = iter(cursors)
+            block_tasks = deque(
+                asyncio.ensure_future(fetch_block(c))
+                for c in islice(pending_cursors, max_concurrency)
+            )
+            try:
+                for pr in self._wrap_pr_block(first_block):
+                    yield pr
+                while block_tasks:
+                    pr_block = await block_tasks.popleft()
+                    # top the window back up, at most max_concurrency blocks are held
+                    for cursor in islice(pending_cursors, 1):
+                        block_tasks.append(asyncio.ensure_future(fetch_block(cursor)))
+                    for pr in self._wrap_pr_block(pr_block):
+                        yield pr
+                # opaque cursors, each block starts after the end cursor of the one before it
+                # a single remaining block is one query either way
+                while remaining > 0 and end_cursor is not None:
+                    pr_block = await fetch_block(end_cursor)
+                    end_cursor = pr_block["repository"]["pullRequests"]["pageInfo"][
+                        "endCursor"
+                    ]
+                    remaining -= block_count
+                    for pr in self._wrap_pr_block(pr_block):
+                        yield pr
+            finally:
+                # consumer may stop early, don't leave queries running on a closed session
+                for block_task in block_tasks:
+                    block_task.cancel()
+                await asyncio.gather(*block_tasks, return_exceptions=True)
+
+    def _wrap_pr_block(self, pr_block):
+        """Generator of PRWrapper instances for the PR nodes in a gql response block"""
+        for pr_node in pr_block["repository"]["pullRequests"]["nodes"]:
+            pr_num = pr_node["number"]
 
             if pr_node["author"]["login"] == "pyup-bot":
                 continue  # ignore pyup PRs
@@ -123,25 +339,38 @@ class RepoWrapper:
             # maybe move the events into a PRWrapper property
             events = []
             for e in pr_node["timelineItems"]["nodes"]:
-                if e.get("author", {}).get("login") == "codecov":
+                # read-only access, the gql payload isn't modified
+                typename = e["__typename"]
+                # some events use actor instead of author, standardize it
+                author = e.get("author") or e.get("actor")
+                author_login = author["login"] if author else None
+                if author_login == "codecov":
                     continue  # ignore codecov comments
-                event_class = EVENT_CLASS_MAP[e.pop("__typename")]
-                if e.get("author") or e.get("actor"):
-                    # some events use actor instead of author, standardize it
-                    e["author"] = (
-                        e.pop("author", {}).get("login") or e.pop("actor")["login"]
+                if typename == "PullRequestReview":
+                    event = PRReviewWrapper(
+                        author=author_login,
+                        created_at=e["createdAt"],
+                        state=e["state"],
+                        comments=e["comments"],
+                    )
+                elif typename == "IssueComment":
+                    event = PRCommentWrapper(
+                        author=author_login, created_at=e["createdAt"]
                     )
-                if e.get("createdAt"):
-                    # just change the camel to underscore formatting
-                    e["created_at"] = e.pop("createdAt")
-                events.append(event_class(**e))
+                elif typename == "ConvertToDraftEvent":
+                    event = DraftWrapper(author=author_login, created_at=e["createdAt"])
+                elif typename == "ReadyForReviewEvent":
+                    event = ReadyWrapper(author=author_login, created_at=e["createdAt"])
+                else:
+                    continue  # not an event type that gets wrapped
+                events.append(event)
 
             if pr_node["mergedAt"] is not None:
-                pr_merged = datetime.strptime(pr_node["mergedAt"], GH_TS_FMT)
+                pr_merged = _parse_gh_ts(pr_node["mergedAt"])
             else:
                 pr_merged = None
 
-            prws[int(pr_num)] = PRWrapper(
+            yield PRWrapper(
                 number=pr_num,
                 repo=self,
                 url=pr_node["url"],
@@ -149,51 +378,102 @@ class RepoWrapper:
                 created_at=pr_node["createdAt"],
                 is_draft=pr_node["isDraft"],
                 timeline_events=events,
-                merged_by=(pr_node["mergedBy"] or {}).pop("login", None),
+                merged_by=pr_node["mergedBy"]["login"] if pr_node["mergedBy"] else None,
                 merged_at=pr_merged,
                 changed_files=pr_node["changedFiles"],
                 state=pr_node["state"],
                 additions=pr_node["additions"],
                 deletions=pr_node["deletions"],
             )
-        return prws
+
+    async def pull_requests_async(
+        self, count=100, block_count=50, max_concurrency=GH_MAX_CONCURRENCY
+    ):
+        """dictionary of PRWrapper instances, keyed on PR numbers
+
+        Same args as aiter_pull_requests
+        """
+        return {
+            pr.number: pr
+            async for pr in self.aiter_pull_requests(
+                count=count, block_count=block_count, max_concurrency=max_concurrency
+            )
+        }
+
+    def iter_pull_requests(
+        self, count=100, block_count=50, max_concurrency=GH_MAX_CONCURRENCY
+    ):
+        """Generator of PRWrapper instances, streamed from aiter_pull_requests
+
+        For callers that only iterate, PRs are yielded as their blocks arrive
+        and nothing is kept once consumed. Same args as aiter_pull_requests
+        """
+        loop = asyncio.new_event_loop()
+        prs = self.aiter_pull_requests(
+            count=count, block_count=block_count, max_concurrency=max_concurrency
+        )
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(prs.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(prs.aclose())
+            loop.close()
+
+    def pull_requests(self, count=100, block_count=50):
+        """Synchronous wrapper for pull_requests_async, same return
+
+        Memoized per repo, count and block_count, so repeated callers share one fetch
+        Use invalidate() to refetch
+        """
+        # one cache key however the args are passed, block_count is capped like the fetch does
+        # copy out of the cache, callers are free to modify what they get back
+        return dict(self._pull_requests(count, min(block_count, count)))
+
+    @lru_cache(maxsize=8)
+    def _pull_requests(self, count, block_count):
+        """Memoized pull_requests, only called with normalized positional args"""
+        return asyncio.run(
+            self.pull_requests_async(count=count, block_count=block_count)
+        )
+
+    def invalidate(self):
+        """Drop memoized pull_requests results, reviewer_team_actions reads from the same cache
+
+        The next call will refetch from GH
+        The cache is shared by all RepoWrapper instances, this clears it for every repo
+        """
+        RepoWrapper._pull_requests.cache_clear()
 
     def reviewer_team_actions(self, pr_count=100):
         """Go through PRs and pull out reviewer actions, collecting them by reviewer teams
 
+        PRs come from the memoized pull_requests, so both share one fetch per repo and pr_count
         Returns
             dictionary of tier1/tier2, where for each actions are listed for every member in team
             count of PRs opened included with tier1, author as 'opened'
             count of PRs merged included with tier2, author as 'merged'
         """
-        reviewer_team_member_actions = {
-            k: {m: [] for m in v} for k, v in self.reviewer_teams.items()
-        }
-        reviewer_team_member_actions["tier1"]["opened"] = []
-        reviewer_team_member_actions["tier2"]["merged"] = []
+        tier1, tier2 = self.reviewer_teams["tier1"], self.reviewer_teams["tier2"]
+        # bind the action lists once, instead of re-indexing by tier inside the loop
+        t1_actions = {m: [] for m in tier1}
+        t2_actions = {m: [] for m in tier2}
+        opened = t1_actions["opened"] = []
+        merged = t2_actions["merged"] = []
         for pr in self.pull_requests(count=pr_count).values():
-            t1_reviews_only = [
-                r for r in pr.reviews_by_tier1 if isinstance(r, PRReviewWrapper)
-            ]
-            for t1 in t1_reviews_only:
-                reviewer_team_member_actions["tier1"][t1.author].append(
-                    (t1.created_at, t1.state)
-                )
-            reviewer_team_member_actions["tier1"]["opened"].append(
-                (pr.created_at, "ready")
-            )
-            t2_reviews_only = [
-                r for r in pr.reviews_by_tier2 if isinstance(r, PRReviewWrapper)
-            ]
-            for t2 in t2_reviews_only:
-                reviewer_team_member_actions["tier2"][t2.author].append(
-                    (t2.created_at, t2.state)
-                )
+            # tier lists come from the single pass in PRWrapper._tiered_reviews
+            for review in pr.reviews_by_tier1:
+                if isinstance(review, PRReviewWrapper):
+                    t1_actions[review.author].append((review.created_at, review.state))
+            opened.append((pr.created_at, "ready"))
+            for review in pr.reviews_by_tier2:
+                if isinstance(review, PRReviewWrapper):
+                    t2_actions[review.author].append((review.created_at, review.state))
             if pr.merged_at is not None:
-                reviewer_team_member_actions["tier2"]["merged"].append(
-                    (pr.merged_at, "merged")
-                )
-        return reviewer_team_member_actions
+                merged.append((pr.merged_at, "merged"))
+        return {"tier1": t1_actions, "tier2": t2_actions}
 
 
 @attr.s
@@ -201,7 +481,7 @@ class EventWrapper:
     """Class for modeling the events in GH"""
 
     author = attr.ib()
-    created_at = attr.ib(converter=lambda t: datetime.strptime(t, GH_TS_FMT))
+    created_at = attr.ib(converter=_parse_gh_ts)
 
 
 @attr.s
@@ -225,24 +505,16 @@ class ReadyWrapper(EventWrapper):
     pass  # same attrs as draft
 
 
-EVENT_CLASS_MAP = dict(
-    IssueComment=PRCommentWrapper,
-    PullRequestReview=PRReviewWrapper,
-    ConvertToDraftEvent=DraftWrapper,
-    ReadyForReviewEvent=ReadyWrapper,
-)
-
-
-@attr.s
+@attr.s(repr=False)
 class PRWrapper:
     """Class for modeling the data returned from the GQL query for PRs"""
 
-    gql_client = GQLClient()
+    gql_client = _GQL_CLIENT
 
     number = attr.ib()
     repo = attr.ib()
     url = attr.ib()
-    created_at = attr.ib(converter=lambda t: datetime.strptime(t, "%Y-%m-%dT%H:%M:%SZ"))
+    created_at = attr.ib(converter=_parse_gh_ts)
     author = attr.ib()
     timeline_events = attr.ib()
     is_draft = attr.ib()
@@ -253,72 +525,98 @@ class PRWrapper:
     additions = attr.ib()
     deletions = attr.ib()
 
+    def __attrs_post_init__(self):
+        # classify timeline events in one pass, properties read their type's bucket
+        self._events_by_type = {
+            cls: []
+            for cls in (PRReviewWrapper, PRCommentWrapper, DraftWrapper, ReadyWrapper)
+        }
+        for event in self.timeline_events:
+            self._events_by_type[type(event)].append(event)
+
     def __repr__(self):
         return (
-            f'[{self.url.split("/")[-1]}] by {self.author}, '
+            f"[{self.number}] by {self.author}, "
             f"review events: {len(self.timeline_events)}"
         )
 
+    @cached_property
+    def _reviews_and_comments_unsorted(self):
+        """Collects reviews and PR comments not by the PR author, in no particular order"""
+        return [
+            review
+            for cls in (PRReviewWrapper, PRCommentWrapper)
+            for review in self._events_by_type[cls]
+            if review.author != self.author
+        ]
+
     @cached_property
     def reviews_and_comments(self):
         """Collects reviews and PR comments, sorted by creation date"""
-        review_events = filter(
-            lambda e: isinstance(e, (PRReviewWrapper, PRCommentWrapper)),
-            self.timeline_events,
-        )
-        events_not_by_author = [
-            review for review in review_events if review.author != self.author
-        ]
-        events_not_by_author.sort(key=lambda r: r.created_at)
-        return events_not_by_author
+        return sorted(self._reviews_and_comments_unsorted, key=lambda r: r.created_at)
 
     @cached_property
+    def _tiered_reviews(self):
+        """Split reviews and comments by reviewer tier in a single pass
+
+        Returns:
+            tuple of tier1 reviews, tier2 reviews, and the set of non-tier review authors
+            review lists are sorted by creation date
+        """
+        tier1_reviews, tier2_reviews, non_tier_authors = [], [], set()
+        if not self._reviews_and_comments_unsorted:
+            return tier1_reviews, tier2_reviews, non_tier_authors
+        tier1 = self.repo.reviewer_teams["tier1"]
+        tier2 = self.repo.reviewer_teams["tier2"]
+        all_tiers = self.repo.reviewer_teams["all"]
+        for review in self._reviews_and_comments_unsorted:
+            author = review.author
+            if author not in all_tiers:
+                non_tier_authors.add(author)
+                continue
+            if author in tier1:
+                tier1_reviews.append(review)
+            if author in tier2:
+                tier2_reviews.append(review)
+        # sorting the tier lists is cheaper than sorting every review first
+        tier1_reviews.sort(key=lambda r: r.created_at)
+        tier2_reviews.sort(key=lambda r: r.created_at)
+        return tier1_reviews, tier2_reviews, non_tier_authors
+
+    @property
     def reviews_by_tier1(self):
-        if not self.reviews_and_comments:
-            return []
-        return [
-            review
-            for review in self.reviews_and_comments
-            if review.author in self.repo.reviewer_teams["tier1"]
-        ]
+        return self._tiered_reviews[0]
 
-    @cached_property
+    @property
     def reviews_by_tier2(self):
-        if not self.reviews_and_comments:
-            return []
-        return [
-            review
-            for review in self.reviews_and_comments
-            if review.author in self.repo.reviewer_teams["tier2"]
-        ]
+        return self._tiered_reviews[1]
 
     @cached_property
     def reviews_by_non_tier(self):
-        return list(
-            set([r.author for r in self.reviews_and_comments])
-            - (
-                set([r.author for r in self.reviews_by_tier1])
-                | set([r.author for r in self.reviews_by_tier2])
-            )
+        return list(self._tiered_reviews[2])
+
+    @cached_property
+    def _first_two_reviews(self):
+        """The two oldest reviews not by the author, without sorting all of them"""
+        return heapq.nsmallest(
+            2, self._reviews_and_comments_unsorted, key=lambda r: r.created_at
         )
 
     @cached_property
     def first_review(self):
         """When the first review on the PR occurred
-        Sorts the reviews not by the author, oldest first
+        Oldest of the reviews not by the author
         Returns None if there are no reviews
         """
-        return None if not self.reviews_and_comments else self.reviews_and_comments[0]
+        return self._first_two_reviews[0] if self._first_two_reviews else None
 
     @cached_property
     def second_review(self):
-        """When the first review on the PR occurred
-        Sorts the reviews not by the author, oldest first
-        Returns None if there are no reviews
+        """When the second review on the PR occurred
+        Second oldest of the reviews not by the author
+        Returns None if there are fewer than two reviews
         """
-        return (
-            None if len(self.reviews_and_comments) < 2 else self.reviews_and_comments[1]
-        )
+        return self._first_two_reviews[1] if len(self._first_two_reviews) > 1 else None
 
     @cached_property
     def ready_for_review(self):
@@ -330,11 +628,9 @@ class PRWrapper:
         Returns:
             list of ReadyWrapper instances
         """
-        # don't want a generator here, wrapping with list explicitly
-        ready_events = list(
-            filter(lambda e: isinstance(e, ReadyWrapper), self.timeline_events)
+        ready_events = sorted(
+            self._events_by_type[ReadyWrapper], key=lambda e: e.created_at
         )
-        ready_events.sort(key=lambda e: e.created_at)
         return ready_events or [
             ReadyWrapper(
                 author=self.author, created_at=self.created_at.strftime(GH_TS_FMT)
@@ -343,9 +639,17 @@ class PRWrapper:
 
     @cached_property
     def comment_comparison_date(self):
+        # only the oldest ready event matters here, no need for the sorted list
+        # PR opened in ready state without ready events, it was ready at creation
+        ready_events = self._events_by_type[ReadyWrapper]
+        first_ready_at = (
+            min(ready_events, key=lambda e: e.created_at).created_at
+            if ready_events
+            else self.created_at
+        )
         # if there were comments before a 'ready for review' event, use PR creation
-        if self.first_review.created_at > self.ready_for_review[0].created_at:
-            comparison_date = self.ready_for_review[0].created_at
+        if self.first_review.created_at > first_ready_at:
+            comparison_date = first_ready_at
         else:
             comparison_date = self.created_at
         return comparison_date
@@ -431,7 +735,7 @@ class PRWrapper:
 class OrgWrapper:
     """Wrap the org queries"""
 
-    gql_client = GQLClient()
+    gql_client = _GQL_CLIENT
 
     name = attr.ib()
 
@@ -439,8 +743,10 @@ class OrgWrapper:
         """Get the logins for the given team"""
         with self.gql_client.session as gql_session:
             gql_data = gql_session.execute(
-                gql(contributors_query.contributions_counts_by_org_members_query),
-                variable_values={"organization": self.name, "team": team},
+                GraphQLRequest(
+                    _CONTRIB_TEAM_QUERY,
+                    variable_values={"organization": self.name, "team": team},
+                )
             )
         click.echo(gql_data)
         return [
@@ -452,7 +758,7 @@ class OrgWrapper:
 class UserWrapper:
     """wrap the user queries"""
 
-    gql_client = GQLClient()
+    gql_client = _GQL_CLIENT
 
     login = attr.ib()
 
@@ -461,7 +767,7 @@ class UserWrapper:
 
         Args:
             from_date: iso8601 datetime, defaults to 1 week ago
-            to_date: iso8601 datetime, defaults to now
+            to_date: iso8601 datetime, defaults to now in UTC at call time
 
         Return:
             list of dicts with contribution counts, looks like:
@@ -473,32 +779,33 @@ class UserWrapper:
                  'issueContributionsByRepository': [],
                  'commitContributionsByRepository': []}},
         """  # noqa: E501
-        from_date = from_date or (NOW - WEEK_DELTA)
-        to_date = to_date or NOW
+        # resolved per call, an import time 'now' goes stale in a long running process
+        now = datetime.now(timezone.utc)
+        from_date = from_date or (now - WEEK_DELTA)
+        to_date = to_date or now
         with self.gql_client.session as gql_session:
             gql_data = gql_session.execute(
-                gql(contributors_query.contributions_counts_by_user_query),
-                variable_values={
-                    "user": self.login,
-                    "from_date": from_date.isoformat(timespec="seconds"),
-                    "to_date": to_date.isoformat(timespec="seconds"),
-                },
+                GraphQLRequest(
+                    _CONTRIB_USER_QUERY,
+                    variable_values={
+                        "user": self.login,
+                        "from_date": from_date.isoformat(timespec="seconds"),
+                        "to_date": to_date.isoformat(timespec="seconds"),
+                    },
+                )
             )
         # flatten dictionary value lists to repo name key and count value
         # also shortening the type string
-        flattened_counts = defaultdict(lambda: defaultdict(dict))
-        for cont_type, repo_conts in Box(
-            gql_data["user"]["contributionsCollection"]
-        ).items():
+        flattened_counts = {}
+        contributions = gql_data["user"]["contributionsCollection"]
+        for cont_type, repo_conts in contributions.items():
             short_type = cont_type[
                 0 : cont_type.index("ContributionsByRepository")  # noqa: E203
             ]
-            if repo_conts:
-                for repo_cont in repo_conts:
-                    flattened_counts[short_type][
-                        repo_cont.repository.name
-                    ] = repo_cont.contributions.totalCount
-            else:  # some are empty lists
-                flattened_counts[short_type] = {}
+            # some are empty lists, which flatten to empty dicts
+            flattened_counts[short_type] = {
+                c["repository"]["name"]: c["contributions"]["totalCount"]
+                for c in repo_conts
+            }
         # click.echo(flattened_counts)
         return flattened_counts
@@ -1,6 +1,7 @@
 # Importable strings for GQL queries
 # Paginated on 50 PRs at a time by default
 # pagination blocks and the cursor for pagination are variables for the query
+# timelineItems only requests the item types that are wrapped as events
 
 pr_review_query = """query getPRs($prCursor: String, $blockCount: Int = 50) {
   repository(owner:"SatelliteQE", name:"Robottelo") {
@@ -8,8 +9,10 @@ pr_review_query = """query getPRs($prCursor: String, $blockCount: Int = 50) {
         first: $blockCount,
         after:  $prCursor
         orderBy: {field: CREATED_AT, direction: DESC}) {
+      totalCount
       nodes {
         author {login}
+        number
         url
         createdAt
         isDraft
@@ -19,8 +22,7 @@ pr_review_query = """query getPRs($prCursor: String, $blockCount: Int = 50) {
         state
         additions
         deletions
-        timelineItems(first: 10, itemTypes: [PULL_REQUEST_REVIEW, PULL_REQUEST_REVIEW_THREAD, ISSUE_COMMENT, CONVERT_TO_DRAFT_EVENT, READY_FOR_REVIEW_EVENT]){
-          totalCount
+        timelineItems(first: 10, itemTypes: [PULL_REQUEST_REVIEW, ISSUE_COMMENT, CONVERT_TO_DRAFT_EVENT, READY_FOR_REVIEW_EVENT]){
           nodes {
             ... on ConvertToDraftEvent {
               __typename